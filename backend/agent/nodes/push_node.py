@@ -8,6 +8,21 @@ from pathlib import Path
 from typing import Dict
 from ..state import AgentState
 
+class _BranchTable(dict):
+    """str.translate table mapping anything outside [a-zA-Z0-9_\\-/.] to '_'.
+
+    Entries are memoized on first sight via __missing__, so sanitizing is a
+    single C-level scan instead of a charset regex pass per call.
+    """
+    def __missing__(self, codepoint):
+        ch = chr(codepoint)
+        mapped = ch if (ch.isascii() and (ch.isalnum() or ch in '_-/.')) else '_'
+        self[codepoint] = mapped
+        return mapped
+
+_BRANCH_TABLE = _BranchTable()
+_UNDERSCORE_RUN = re.compile(r'_+')
+
 def sanitize_branch_name(name: str) -> str:
     """Make any branch name valid for git.
     Rules:
@@ -17,9 +32,8 @@ def sanitize_branch_name(name: str) -> str:
     - Max 100 chars
     - Must end with _AI_Fix if it doesn't already
     """
-    name = name.strip()
-    name = re.sub(r'[^a-zA-Z0-9_\-/.]', '_', name)
-    name = re.sub(r'_+', '_', name)
+    name = name.strip().translate(_BRANCH_TABLE)
+    name = _UNDERSCORE_RUN.sub('_', name)
     name = name.strip('_').strip('-')
     
     if not name.upper().endswith('_AI_FIX'):
@@ -1,5 +1,6 @@
 import subprocess
 import os
+import shutil
 from datetime import datetime
 from typing import Dict
 from ..state import AgentState
@@ -45,11 +46,7 @@ def run_tests(state: AgentState) -> Dict:
             output += "=FLAKE8=\n"
             try:
                 # Try to find flake8 in PATH
-                flake8_cmd = "flake8"
-                # Check if flake8 exists
-                check_result = subprocess.run(["which", "flake8"], capture_output=True, text=True)
-                if check_result.returncode == 0:
-                    flake8_cmd = check_result.stdout.strip()
+                flake8_cmd = shutil.which("flake8") or "flake8"
                 
                 result = subprocess.run(
                     [flake8_cmd, ".", "--max-line-length=120", 
@@ -68,10 +65,7 @@ def run_tests(state: AgentState) -> Dict:
             output += "\n=MYPY=\n"
             try:
                 # Try to find mypy in PATH
-                mypy_cmd = "mypy"
-                check_result = subprocess.run(["which", "mypy"], capture_output=True, text=True)
-                if check_result.returncode == 0:
-                    mypy_cmd = check_result.stdout.strip()
+                mypy_cmd = shutil.which("mypy") or "mypy"
                 
                 result = subprocess.run(
                     [mypy_cmd, ".", "--ignore-missing-imports"],
@@ -88,10 +82,7 @@ def run_tests(state: AgentState) -> Dict:
             output += "\n=PYTEST=\n"
             try:
                 # Try to find pytest in PATH
-                pytest_cmd = "pytest"
-                check_result = subprocess.run(["which", "pytest"], capture_output=True, text=True)
-                if check_result.returncode == 0:
-                    pytest_cmd = check_result.stdout.strip()
+                pytest_cmd = shutil.which("pytest") or "pytest"
                 
                 result = subprocess.run(
                     [pytest_cmd, "--tb=short", "-q"],
@@ -7,6 +7,20 @@ from .nodes.fix_node import apply_fixes
 from .nodes.verify_node import verify_fixes
 import time
 
+# Per-second cache for ISO timestamps, mirroring the API layer's utc_iso -
+# timeline events within the same second reuse the formatted string
+_iso_cache = (0, "")
+
+def utc_iso_now() -> str:
+    """ISO 8601 UTC timestamp string, cached per whole second."""
+    global _iso_cache
+    second = int(time.time())
+    cached_second, cached_value = _iso_cache
+    if second != cached_second or not cached_value:
+        cached_value = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(second))
+        _iso_cache = (second, cached_value)
+    return cached_value
+
 # Build the graph
 builder = StateGraph(AgentState)
 
@@ -71,10 +85,18 @@ compiled_graph = builder.compile()
 class HealingOrchestrator:
     """Orchestrator for the healing agent workflow."""
     
-    def __init__(self, job_id: str, jobs_store: dict):
+    def __init__(self, job_id: str, jobs_store: dict, on_update=None):
         self.job_id = job_id
         self.jobs = jobs_store
-    
+        # Optional thread-safe callback fired after every state mutation so
+        # the API layer can wake SSE clients immediately instead of waiting
+        # for its periodic scan.
+        self.on_update = on_update
+
+    def _notify(self):
+        if self.on_update:
+            self.on_update()
+
     def run(self, repo_url: str, branch_name: str, github_token: str, team_name: str, leader_name: str):
         """Run the healing workflow for a repository."""
         initial_state: AgentState = {
@@ -107,15 +129,17 @@ class HealingOrchestrator:
         
         # Sync initial state
         self.jobs[self.job_id].update(initial_state)
-        
+        self._notify()
+
         try:
             # Stream through the graph and update job state
             for step_output in compiled_graph.stream(initial_state, config={"recursion_limit": 100}):
-                node_name = list(step_output.keys())[0]
+                node_name = next(iter(step_output))
                 updated = step_output[node_name]
                 
                 # Update jobs dict so SSE can stream it
                 self.jobs[self.job_id].update(updated)
+                self._notify()
                 print(f"[{self.job_id}] Node '{node_name}' completed — status: {self.jobs[self.job_id].get('status')}")
                 
             # Keep job open in memory if it requires human review
@@ -125,6 +149,7 @@ class HealingOrchestrator:
         except Exception as e:
             self.jobs[self.job_id]["status"] = "failed"
             self.jobs[self.job_id]["error_message"] = str(e)
+            self._notify()
             import traceback
             traceback.print_exc()
 
@@ -143,7 +168,7 @@ def execute_review_push(job_id: str, jobs_store: dict, declined_files: list) ->
     state["timeline"].append({
         "agent": "Review Agent",
         "msg": f"User review complete. Declined {len(declined_files)} files. Proceeding to push...",
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "timestamp": utc_iso_now(),
         "iteration": state["retry_count"],
         "passed": True
     })
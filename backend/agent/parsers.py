@@ -3,6 +3,7 @@ Optimized parsers with O(n) time complexity and minimal memory overhead.
 Uses compiled regex patterns and efficient data structures.
 """
 import re
+import sys
 from typing import List, Dict, Set
 from functools import lru_cache
 
@@ -60,10 +61,12 @@ def build_fix_dict(type_str: str, file: str, line: int, message: str, fix_desc:
     """Build fix dictionary with minimal string operations."""
     fix_id = build_fix_id(type_str, file, line)
     
+    # Intern the heavily repeated values: a run produces many fixes sharing
+    # the same type and file, but each regex match allocates fresh strings
     return {
         "id": fix_id,
-        "type": type_str,
-        "file": file,
+        "type": sys.intern(type_str),
+        "file": sys.intern(file),
         "line": line,
         "message": message,
         "formatted": f"{type_str} error in {file} line {line} → Fix: {fix_desc}",
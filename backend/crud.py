@@ -2,13 +2,13 @@
 CRUD operations for the Healing Agent database.
 All functions accept a SQLAlchemy session and return dicts/models.
 """
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import func, extract
 from typing import Optional, List, Dict, Any
 from datetime import datetime, timezone
 import time
 
-from models import Run, Fix, TimelineEvent
+from models import Run, Fix, TimelineEvent, StatsDaily, StatsBugType
 
 
 # ─── Run Operations ─────────────────────────────────────────────
@@ -18,6 +18,7 @@ def create_run(db: Session, job_data: dict) -> Run:
     run = Run(
         id=job_data["job_id"],
         repo_url=job_data.get("repo_url", ""),
+        repo_slug=job_data.get("repo", ""),
         team_name=job_data.get("team_name", ""),
         leader_name=job_data.get("leader_name", ""),
         branch_name=job_data.get("branch_name", ""),
@@ -40,7 +41,8 @@ def create_run(db: Session, job_data: dict) -> Run:
     )
     db.add(run)
     db.commit()
-    db.refresh(run)
+    # No refresh: every field was set client-side (created_at/updated_at use
+    # Python defaults), so the extra SELECT round trip buys nothing.
     return run
 
 
@@ -49,8 +51,10 @@ def save_completed_run(db: Session, job_data: dict) -> Run:
     Save or update a completed run with all its fixes and timeline events.
     This replaces the old archive_job() deque logic.
     """
-    # Check if run already exists
+    # Check if run already exists. A row created at submit time is still
+    # uncounted - only a previous terminal save has touched the stats buckets.
     existing = db.query(Run).filter(Run.id == job_data.get("job_id")).first()
+    already_counted = existing is not None and existing.status in ("done", "failed")
 
     if existing:
         run = existing
@@ -60,6 +64,7 @@ def save_completed_run(db: Session, job_data: dict) -> Run:
 
     # Update all fields
     run.repo_url = job_data.get("repo_url", "")
+    run.repo_slug = job_data.get("repo", "")
     run.team_name = job_data.get("team_name", "")
     run.leader_name = job_data.get("leader_name", "")
     run.branch_name = job_data.get("branch_name", "")
@@ -104,43 +109,86 @@ def save_completed_run(db: Session, job_data: dict) -> Run:
     db.query(Fix).filter(Fix.run_id == run.id).delete()
     db.query(TimelineEvent).filter(TimelineEvent.run_id == run.id).delete()
 
-    # Insert fixes
+    # Insert fixes (bulk, chunked to stay under SQLite's parameter limit)
     fixes_data = job_data.get("fixes", [])
     if isinstance(fixes_data, list):
-        for fix in fixes_data:
-            if isinstance(fix, dict):
-                db.add(Fix(
-                    run_id=run.id,
-                    fix_id=fix.get("id", ""),
-                    type=fix.get("type", "UNKNOWN"),
-                    file=fix.get("file", ""),
-                    line=fix.get("line", 0),
-                    message=fix.get("message", ""),
-                    formatted=fix.get("formatted", ""),
-                    fix_description=fix.get("fix_description", ""),
-                    commit_message=fix.get("commit_message", ""),
-                    status=fix.get("status", "pending"),
-                ))
+        _bulk_insert_chunked(db, Fix, [
+            {
+                "run_id": run.id,
+                "fix_id": fix.get("id", ""),
+                "type": fix.get("type", "UNKNOWN"),
+                "file": fix.get("file", ""),
+                "line": fix.get("line", 0),
+                "message": fix.get("message", ""),
+                "formatted": fix.get("formatted", ""),
+                "fix_description": fix.get("fix_description", ""),
+                "commit_message": fix.get("commit_message", ""),
+                "status": fix.get("status", "pending"),
+            }
+            for fix in fixes_data if isinstance(fix, dict)
+        ])
 
     # Insert timeline events
     timeline_data = job_data.get("timeline", [])
     if isinstance(timeline_data, list):
-        for event in timeline_data:
-            if isinstance(event, dict):
-                db.add(TimelineEvent(
-                    run_id=run.id,
-                    agent=event.get("agent", ""),
-                    msg=event.get("msg", ""),
-                    timestamp=event.get("timestamp", ""),
-                    iteration=event.get("iteration", 0),
-                    passed=event.get("passed", False),
-                ))
+        _bulk_insert_chunked(db, TimelineEvent, [
+            {
+                "run_id": run.id,
+                "agent": event.get("agent", ""),
+                "msg": event.get("msg", ""),
+                "timestamp": event.get("timestamp", ""),
+                "iteration": event.get("iteration", 0),
+                "passed": event.get("passed", False),
+            }
+            for event in timeline_data if isinstance(event, dict)
+        ])
+
+    # Bump the materialized stats buckets (only once per run) - this fires
+    # for the create_run-at-submit -> save-at-finish flow too, where the row
+    # already exists but was never counted
+    if not already_counted:
+        _increment_stats(db, run, fixes_data)
 
     db.commit()
-    db.refresh(run)
     return run
 
 
+# ~11 columns per row keeps each multi-row INSERT under SQLite's
+# default 999-parameter limit
+_BULK_CHUNK = 80
+
+
+def _bulk_insert_chunked(db: Session, model, mappings: List[Dict[str, Any]]):
+    """bulk_insert_mappings in chunks so one big run can't blow the limit."""
+    for i in range(0, len(mappings), _BULK_CHUNK):
+        db.bulk_insert_mappings(model, mappings[i:i + _BULK_CHUNK])
+
+
+def _increment_stats(db: Session, run: Run, fixes_data: list):
+    """Increment the pre-aggregated stats buckets for a newly saved run."""
+    day = (run.timestamp or "")[:10] or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+
+    bucket = db.get(StatsDaily, (day, run.ci_status or "PENDING"))
+    if bucket is None:
+        bucket = StatsDaily(day=day, ci_status=run.ci_status or "PENDING",
+                            runs=0, fixes=0, elapsed=0.0)
+        db.add(bucket)
+    bucket.runs = (bucket.runs or 0) + 1
+    bucket.fixes = (bucket.fixes or 0) + (run.errors_fixed or 0)
+    bucket.elapsed = (bucket.elapsed or 0.0) + (run.elapsed_seconds or 0.0)
+
+    if isinstance(fixes_data, list):
+        for fix in fixes_data:
+            if not isinstance(fix, dict):
+                continue
+            bug_type = fix.get("type") or "UNKNOWN"
+            counter = db.get(StatsBugType, bug_type)
+            if counter is None:
+                counter = StatsBugType(type=bug_type, count=0)
+                db.add(counter)
+            counter.count = (counter.count or 0) + 1
+
+
 def get_run(db: Session, job_id: str) -> Optional[Run]:
     """Get a single run by job_id."""
     return db.query(Run).filter(Run.id == job_id).first()
@@ -169,79 +217,80 @@ def get_run_count(db: Session) -> int:
 
 def get_stats(db: Session) -> dict:
     """
-    Compute dashboard stats from the database.
-    Replaces the in-memory stats computation in main.py.
+    Read dashboard stats from the pre-aggregated stats tables.
+    save_completed_run keeps stats_daily/stats_bugtype up to date, so this
+    is a tiny scan over <100 bucket rows instead of every run.
     """
-    runs = get_all_runs(db, limit=1000)
+    buckets = db.query(StatsDaily).all()
 
-    if not runs:
-        return {
-            "successRate": 0,
-            "totalFixes": 0,
-            "avgFixTime": 0,
-            "byDay": {},
-            "byBugType": {},
-            "thisMonth": 0,
-            "lastMonth": 0,
-            "totalRuns": 0,
-        }
-
-    total = len(runs)
+    total = 0
     passed_count = 0
     total_fixes = 0
     total_time = 0.0
-    by_bug_type = {}
 
     now = datetime.now()
     this_month, this_year = now.month, now.year
     last_month_num = 12 if this_month == 1 else this_month - 1
     last_year = this_year - 1 if this_month == 1 else this_year
 
-    this_month_runs = []
-    last_month_runs = []
+    this_month_prefix = f"{this_year}-{this_month:02d}"
+    last_month_prefix = f"{last_year}-{last_month_num:02d}"
+    this_month_total = this_month_passed = 0
+    last_month_total = last_month_passed = 0
 
     day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
     by_day = {day_names[(now.weekday() - i) % 7]: {"runs": 0, "fixes": 0} for i in range(6, -1, -1)}
 
-    for r in runs:
-        if r.ci_status == "PASSED":
-            passed_count += 1
-
-        total_fixes += r.errors_fixed or 0
-        total_time += r.elapsed_seconds or 0
-
-        # Bug types from fixes
-        for fix in r.fixes:
-            bug_type = fix.type or "UNKNOWN"
-            by_bug_type[bug_type] = by_bug_type.get(bug_type, 0) + 1
+    for b in buckets:
+        runs = b.runs or 0
+        total += runs
+        if b.ci_status == "PASSED":
+            passed_count += runs
+        total_fixes += b.fixes or 0
+        total_time += b.elapsed or 0.0
 
-        # By day and month
         try:
-            ts = r.timestamp
-            if ts:
-                dt = datetime.strptime(ts[:19], "%Y-%m-%dT%H:%M:%S")
-                dn = day_names[dt.weekday()]
-                if dn in by_day:
-                    by_day[dn]["runs"] += 1
-                    by_day[dn]["fixes"] += r.errors_fixed or 0
-
-                if dt.month == this_month and dt.year == this_year:
-                    this_month_runs.append(r)
-                elif dt.month == last_month_num and dt.year == last_year:
-                    last_month_runs.append(r)
-        except Exception:
-            pass
+            dt = datetime.strptime(b.day, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            continue
+
+        if (now - dt).days < 7:
+            dn = day_names[dt.weekday()]
+            if dn in by_day:
+                by_day[dn]["runs"] += runs
+                by_day[dn]["fixes"] += b.fixes or 0
+
+        if b.day.startswith(this_month_prefix):
+            this_month_total += runs
+            if b.ci_status == "PASSED":
+                this_month_passed += runs
+        elif b.day.startswith(last_month_prefix):
+            last_month_total += runs
+            if b.ci_status == "PASSED":
+                last_month_passed += runs
+
+    by_bug_type = {
+        row.type: row.count
+        for row in db.query(StatsBugType).order_by(StatsBugType.count.desc()).limit(20)
+    }
+
+    if not total:
+        return {
+            "successRate": 0,
+            "totalFixes": 0,
+            "avgFixTime": 0,
+            "byDay": {},
+            "byBugType": {},
+            "thisMonth": 0,
+            "lastMonth": 0,
+            "totalRuns": 0,
+        }
 
     success_rate = (passed_count / total) * 100 if total else 0
     avg_fix_time = total_time / total if total else 0
 
-    this_month_rate = (
-        sum(1 for r in this_month_runs if r.ci_status == "PASSED") / len(this_month_runs) * 100
-    ) if this_month_runs else 0
-
-    last_month_rate = (
-        sum(1 for r in last_month_runs if r.ci_status == "PASSED") / len(last_month_runs) * 100
-    ) if last_month_runs else 0
+    this_month_rate = (this_month_passed / this_month_total * 100) if this_month_total else 0
+    last_month_rate = (last_month_passed / last_month_total * 100) if last_month_total else 0
 
     return {
         "successRate": round(success_rate, 1),
@@ -1,18 +1,118 @@
 import sqlite3
-import json
-from datetime import datetime
+import orjson
+from datetime import datetime, timezone
 from typing import Dict, List, Optional
 from pathlib import Path
 
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker, declarative_base
+
 DB_PATH = "data/rift_agent.db"
 
+# One engine for the whole backend. The SQLAlchemy layer (models.py/crud.py)
+# and the raw helpers below all draw connections from its pool, so we stop
+# paying a fresh sqlite3.connect() on every single call.
+engine = create_engine(
+    f"sqlite:///{DB_PATH}",
+    connect_args={"check_same_thread": False},
+)
+SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+Base = declarative_base()
+
+
+@event.listens_for(engine, "connect")
+def _set_sqlite_pragmas(dbapi_conn, _connection_record):
+    """Tune every pooled connection for our WAL workload.
+
+    WAL lets dashboard reads proceed while a run is being archived instead
+    of blocking on the writer's lock. synchronous=NORMAL skips the per-commit
+    fsync (safe under WAL - a crash can only lose the last transactions, not
+    corrupt the file), and the larger cache/mmap keep the runs table and its
+    indexes in memory for the stats aggregations.
+    """
+    cursor = dbapi_conn.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-65536")       # 64 MB page cache
+    cursor.execute("PRAGMA mmap_size=268435456")     # 256 MB mmap window
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA busy_timeout=3000")
+    cursor.close()
+
+
+def get_connection():
+    """Checkout a pooled DBAPI (sqlite3) connection from the shared engine.
+
+    close() returns the connection to the pool instead of tearing it down.
+    """
+    return engine.raw_connection()
+
+# ─── SQL statements ───────────────────────────────────────────────
+# Module-level constants so every call passes the identical string object;
+# sqlite3 caches compiled statements per connection keyed on the SQL text,
+# so this guarantees prepared-statement reuse instead of re-parsing.
+
+SQL_UPSERT_USER = """
+    INSERT INTO users (github_id, username, email, avatar_url, github_token)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(github_id) DO UPDATE SET
+        username=excluded.username,
+        email=excluded.email,
+        avatar_url=excluded.avatar_url,
+        github_token=excluded.github_token
+"""
+
+SQL_USER_ID_BY_GITHUB_ID = "SELECT id FROM users WHERE github_id=?"
+SQL_USER_BY_GITHUB_ID = "SELECT * FROM users WHERE github_id=?"
+SQL_USER_BY_TOKEN = "SELECT * FROM users WHERE github_token=?"
+
+SQL_INSERT_RUN = """
+    INSERT INTO runs (
+        job_id, user_id, repo_url, repo_language, team_name, leader_name,
+        branch_name, errors_found, errors_fixed, commit_count,
+        verify_passed, ci_status, push_success, score_total, elapsed_seconds,
+        fixes_json
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+SQL_USER_RUNS = "SELECT * FROM runs WHERE user_id=? ORDER BY created_at DESC LIMIT ?"
+SQL_RUN_BY_JOB_ID = "SELECT * FROM runs WHERE job_id=?"
+
+SQL_BUMP_STATS_DAILY = """
+    INSERT INTO stats_daily (day, ci_status, runs, fixes, elapsed)
+    VALUES (?, ?, 1, ?, ?)
+    ON CONFLICT(day, ci_status) DO UPDATE SET
+        runs = runs + 1,
+        fixes = fixes + excluded.fixes,
+        elapsed = elapsed + excluded.elapsed
+"""
+
+SQL_BUMP_STATS_BUGTYPE = """
+    INSERT INTO stats_bugtype (type, count)
+    VALUES (?, ?)
+    ON CONFLICT(type) DO UPDATE SET count = count + excluded.count
+"""
+
+
+def _user_dict(row: sqlite3.Row) -> Dict:
+    """Map a users row to the dict shape the API layer expects."""
+    return {
+        "id": row["id"],
+        "github_id": row["github_id"],
+        "username": row["username"],
+        "email": row["email"],
+        "avatar_url": row["avatar_url"],
+        "github_token": row["github_token"],
+        "created_at": row["created_at"]
+    }
+
 def init_db():
     """Initialize database with tables."""
     Path("data").mkdir(exist_ok=True)
-    
-    conn = sqlite3.connect(DB_PATH)
+
+    conn = get_connection()
     cursor = conn.cursor()
-    
+
     # Users table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS users (
@@ -25,7 +125,7 @@ def init_db():
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """)
-    
+
     # Runs table
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS runs (
@@ -45,220 +145,193 @@ def init_db():
             push_success BOOLEAN,
             score_total INTEGER,
             elapsed_seconds REAL,
+            fixes_json TEXT,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users(id)
         )
     """)
-    
-    # Fixes table
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS fixes (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            run_id INTEGER,
-            fix_id TEXT,
-            type TEXT,
-            file TEXT,
-            line INTEGER,
-            message TEXT,
-            fix_description TEXT,
-            diff TEXT,
-            status TEXT,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (run_id) REFERENCES runs(id)
-        )
-    """)
-    
-    # Try to add diff column if missing (for existing databases)
+
+    # Try to add fixes_json column if missing (for existing databases that
+    # still carry the old normalized fixes table)
     try:
-        cursor.execute("ALTER TABLE fixes ADD COLUMN diff TEXT;")
+        cursor.execute("ALTER TABLE runs ADD COLUMN fixes_json TEXT;")
     except sqlite3.OperationalError:
         pass # Column already exists
-    
+
+    # Covering index for the stats aggregations: every column the queries
+    # touch lives in the index B-tree, so SQLite answers them without
+    # reading row payloads (which would drag the fixes_json blobs in)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_runs_stats
+        ON runs(user_id, created_at, ci_status, errors_fixed, elapsed_seconds)
+    """)
+
     conn.commit()
     conn.close()
+
+    # Create the SQLAlchemy-side tables (timeline_events, stats buckets, ...)
+    # on the same engine. Imported here to avoid a circular import, since
+    # models.py pulls Base from this module.
+    import models  # noqa: F401
+    Base.metadata.create_all(bind=engine)
+
     print("[DB] Database initialized")
 
 def save_user(github_id: str, username: str, email: str, avatar_url: str, github_token: str) -> int:
     """Save or update user."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT INTO users (github_id, username, email, avatar_url, github_token)
-        VALUES (?, ?, ?, ?, ?)
-        ON CONFLICT(github_id) DO UPDATE SET
-            username=excluded.username,
-            email=excluded.email,
-            avatar_url=excluded.avatar_url,
-            github_token=excluded.github_token
-    """, (github_id, username, email, avatar_url, github_token))
-    
-    user_id = cursor.lastrowid
-    if user_id == 0:
-        cursor.execute("SELECT id FROM users WHERE github_id=?", (github_id,))
-        user_id = cursor.fetchone()[0]
-    
+
+    cursor.execute(SQL_UPSERT_USER, (github_id, username, email, avatar_url, github_token))
+
+    # Always resolve the id by github_id: on the DO UPDATE path lastrowid is
+    # whatever this pooled connection last inserted (possibly a runs row),
+    # not 0 like it was when every call opened a fresh connection.
+    cursor.execute(SQL_USER_ID_BY_GITHUB_ID, (github_id,))
+    user_id = cursor.fetchone()[0]
+
     conn.commit()
     conn.close()
     return user_id
 
 def get_user_by_github_id(github_id: str) -> Optional[Dict]:
     """Get user by GitHub ID."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM users WHERE github_id=?", (github_id,))
+    cursor.row_factory = sqlite3.Row
+
+    cursor.execute(SQL_USER_BY_GITHUB_ID, (github_id,))
     row = cursor.fetchone()
     conn.close()
-    
-    if row:
-        return {
-            "id": row[0],
-            "github_id": row[1],
-            "username": row[2],
-            "email": row[3],
-            "avatar_url": row[4],
-            "github_token": row[5],
-            "created_at": row[6]
-        }
-    return None
+
+    return _user_dict(row) if row else None
 
 def get_user_by_token(token: str) -> Optional[Dict]:
     """Get user by GitHub token."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM users WHERE github_token=?", (token,))
+    cursor.row_factory = sqlite3.Row
+
+    cursor.execute(SQL_USER_BY_TOKEN, (token,))
     row = cursor.fetchone()
     conn.close()
-    
-    if row:
-        return {
-            "id": row[0],
-            "github_id": row[1],
-            "username": row[2],
-            "email": row[3],
-            "avatar_url": row[4],
-            "github_token": row[5],
-            "created_at": row[6]
-        }
-    return None
+
+    return _user_dict(row) if row else None
 
 def save_run(job_id: str, user_id: int, results: Dict) -> int:
-    """Save run results."""
-    conn = sqlite3.connect(DB_PATH)
+    """Save run results and bump the materialized stats buckets."""
+    conn = get_connection()
     cursor = conn.cursor()
-    
-    cursor.execute("""
-        INSERT INTO runs (
-            job_id, user_id, repo_url, repo_language, team_name, leader_name,
-            branch_name, errors_found, errors_fixed, commit_count,
-            verify_passed, ci_status, push_success, score_total, elapsed_seconds
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
+
+    fixes = results.get("fixes", [])
+    if not isinstance(fixes, list):
+        fixes = []
+    elapsed = results.get("score", {}).get("elapsed_seconds", 0)
+
+    # Fixes go into a single JSON column - one INSERT instead of N+1,
+    # and reads need no second SELECT
+    cursor.execute(SQL_INSERT_RUN, (
         job_id, user_id, results.get("repo_url"), results.get("repo_language"),
         results.get("team_name"), results.get("leader_name"), results.get("branch_name"),
         results.get("errors_found", 0), results.get("errors_fixed", 0),
         results.get("commit_count", 0), results.get("verify_passed", False),
         results.get("ci_status"), results.get("push_success", False),
         results.get("score", {}).get("total", 0),
-        results.get("score", {}).get("elapsed_seconds", 0)
+        elapsed,
+        orjson.dumps(fixes, default=str).decode()
     ))
-    
+
     run_id = cursor.lastrowid
-    
-    # Save fixes
-    for fix in results.get("fixes", []):
-        cursor.execute("""
-            INSERT INTO fixes (run_id, fix_id, type, file, line, message, fix_description, diff, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            run_id, fix.get("id"), fix.get("type"), fix.get("file"),
-            fix.get("line"), fix.get("message"), fix.get("fix_description"),
-            fix.get("diff", ""), fix.get("status")
-        ))
-    
+
+    # Keep the pre-aggregated stats buckets in step with the archive path,
+    # inside the same transaction so readers never see a half-counted run
+    day = (results.get("timestamp") or "")[:10] or datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    cursor.execute(SQL_BUMP_STATS_DAILY, (
+        day,
+        results.get("ci_status") or "PENDING",
+        results.get("errors_fixed", 0),
+        elapsed,
+    ))
+
+    type_counts: Dict[str, int] = {}
+    for fix in fixes:
+        if not isinstance(fix, dict):
+            continue
+        bug_type = fix.get("type") or "UNKNOWN"
+        type_counts[bug_type] = type_counts.get(bug_type, 0) + 1
+    if type_counts:
+        cursor.executemany(SQL_BUMP_STATS_BUGTYPE, list(type_counts.items()))
+
     conn.commit()
     conn.close()
     return run_id
 
 def get_user_runs(user_id: int, limit: int = 10) -> List[Dict]:
     """Get user's recent runs."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
-    
-    cursor.execute("""
-        SELECT * FROM runs WHERE user_id=? ORDER BY created_at DESC LIMIT ?
-    """, (user_id, limit))
-    
+    cursor.row_factory = sqlite3.Row
+
+    cursor.execute(SQL_USER_RUNS, (user_id, limit))
+
     rows = cursor.fetchall()
     conn.close()
-    
+
     runs = []
     for row in rows:
+        created_at = row["created_at"]
         runs.append({
-            "id": row[0],
-            "job_id": row[1],
-            "repo": row[3], # Remap repo_url to repo for frontend Display
-            "repo_language": row[4],
-            "team_name": row[5],
-            "leader_name": row[6],
-            "branch_name": row[7],
-            "errors_found": row[8],
-            "errors_fixed": row[9],
-            "ci_status": row[12],
+            "id": row["id"],
+            "job_id": row["job_id"],
+            "repo": row["repo_url"], # Remap repo_url to repo for frontend Display
+            "repo_language": row["repo_language"],
+            "team_name": row["team_name"],
+            "leader_name": row["leader_name"],
+            "branch_name": row["branch_name"],
+            "errors_found": row["errors_found"],
+            "errors_fixed": row["errors_fixed"],
+            "ci_status": row["ci_status"],
             "score": {
-                "total": row[14],
-                "elapsed_seconds": row[15]
+                "total": row["score_total"],
+                "elapsed_seconds": row["elapsed_seconds"]
             },
-            "timestamp": (row[16][:19].replace(" ", "T") + "Z") if row[16] else None
+            "timestamp": (created_at[:19].replace(" ", "T") + "Z") if created_at else None
         })
 
-    
+
     return runs
 
 def get_run_details(job_id: str) -> Optional[Dict]:
     """Get run details with fixes."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_connection()
     cursor = conn.cursor()
-    
-    cursor.execute("SELECT * FROM runs WHERE job_id=?", (job_id,))
+    cursor.row_factory = sqlite3.Row
+
+    cursor.execute(SQL_RUN_BY_JOB_ID, (job_id,))
     run_row = cursor.fetchone()
-    
+    conn.close()
+
     if not run_row:
-        conn.close()
         return None
-    
-    cursor.execute("SELECT * FROM fixes WHERE run_id=?", (run_row[0],))
-    fix_rows = cursor.fetchall()
-    conn.close()
-    
-    fixes = []
-    for row in fix_rows:
-        fixes.append({
-            "id": row[2],
-            "type": row[3],
-            "file": row[4],
-            "line": row[5],
-            "message": row[6],
-            "fix_description": row[7],
-            "diff": getattr(row, '9', '') if len(row) > 9 and row[9] is not None else (row[8] if len(row)>9 and "diff TEXT" in "" else (row[9] if len(row) > 9 else "")),
-            "status": row[8]
-        })
-    
+
+    try:
+        fixes = orjson.loads(run_row["fixes_json"]) if run_row["fixes_json"] else []
+    except (orjson.JSONDecodeError, TypeError):
+        fixes = []
+
     return {
-        "job_id": run_row[1],
-        "repo_url": run_row[3],
-        "repo_language": run_row[4],
-        "team_name": run_row[5],
-        "leader_name": run_row[6],
-        "branch_name": run_row[7],
-        "errors_found": run_row[8],
-        "errors_fixed": run_row[9],
-        "commit_count": run_row[10],
-        "ci_status": run_row[12],
-        "score_total": run_row[14],
-        "elapsed_seconds": run_row[15],
-        "created_at": run_row[16],
+        "job_id": run_row["job_id"],
+        "repo_url": run_row["repo_url"],
+        "repo_language": run_row["repo_language"],
+        "team_name": run_row["team_name"],
+        "leader_name": run_row["leader_name"],
+        "branch_name": run_row["branch_name"],
+        "errors_found": run_row["errors_found"],
+        "errors_fixed": run_row["errors_fixed"],
+        "commit_count": run_row["commit_count"],
+        "ci_status": run_row["ci_status"],
+        "score_total": run_row["score_total"],
+        "elapsed_seconds": run_row["elapsed_seconds"],
+        "created_at": run_row["created_at"],
         "fixes": fixes
     }
@@ -8,26 +8,32 @@ Optimized FastAPI server with:
 - GitHub OAuth authentication
 - Per-user GitHub token management
 """
-from fastapi import FastAPI, BackgroundTasks, HTTPException, Depends, Header
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Depends, Header, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
 from dotenv import load_dotenv
-from functools import lru_cache
+from functools import lru_cache, partial
+from concurrent.futures import ThreadPoolExecutor
+import aiofiles
 import asyncio
+import hashlib
+import httpx
 import uuid
-import json
+import orjson
 import os
 import pathlib
 import time
-import subprocess
 import re
-import urllib.request
-import urllib.parse
-import urllib.error
+import traceback
+from datetime import datetime
 
-from database import init_db, save_user, get_user_by_github_id, save_run, get_user_runs
+from database import (
+    init_db, save_user, get_user_by_github_id, get_user_by_token, save_run,
+    get_user_runs, get_run_details, get_connection,
+)
+from agent.orchestrator import HealingOrchestrator, execute_review_push
 
 load_dotenv()
 
@@ -43,18 +49,116 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+main_loop = None  # captured at startup so worker threads can signal the loop
+broadcaster_task = None  # single job-watcher task, started at startup
+
+# One AsyncClient for every GitHub API call - shares a keep-alive connection
+# pool instead of paying a fresh TCP+TLS handshake per request
+http_client = httpx.AsyncClient(timeout=10)
+
 @app.on_event("startup")
-def startup_event():
+async def startup_event():
     """Initialize database tables on server startup."""
+    global main_loop, broadcaster_task
+    main_loop = asyncio.get_running_loop()
+    broadcaster_task = asyncio.create_task(_broadcast_loop())
     init_db()
     print("[STARTUP] Database initialized successfully")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release the shared HTTP connection pool."""
+    await http_client.aclose()
+
 # In-memory store for ACTIVE jobs only (needed for SSE streaming)
 jobs: dict = {}  # O(1) lookup by job_id
 
+# Per-job change signals so SSE streams wake on updates instead of polling
+job_events: Dict[str, asyncio.Event] = {}
+
+# Strong references to in-flight pipeline tasks (asyncio only keeps weak ones)
+pipeline_tasks: set = set()
+
+# Dedicated executor for multi-minute orchestrator runs so they never starve
+# the default to_thread pool that serves quick DB lookups. A process pool
+# would give truer parallelism but would sever the shared jobs dict the
+# orchestrator mutates in place; the heavy work (git, pytest, LLM calls)
+# happens in subprocesses and network waits that release the GIL anyway.
+pipeline_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 4, thread_name_prefix="pipeline"
+)
+
+# O(1) index of recently completed jobs (job_id -> final snapshot) so result
+# lookups don't have to touch the file cache or database right after a run
+completed_jobs: Dict[str, dict] = {}
+COMPLETED_CACHE_SIZE = 100
+
+# Short-TTL cache of /api/stats payloads keyed by user_id; archive_job
+# invalidates the affected user so fresh runs show up immediately
+stats_cache: Dict[int, tuple] = {}  # user_id -> (expires_at, payload)
+STATS_CACHE_TTL = 10.0
+
+def notify_job(job_id: str):
+    """Wake any SSE stream waiting on this job. Safe from worker threads."""
+    event = job_events.get(job_id)
+    if event and main_loop:
+        main_loop.call_soon_threadsafe(event.set)
+
+async def _broadcast_loop():
+    """Single watcher that signals job events when pipeline state changes.
+
+    One task scans all active jobs instead of every SSE connection running
+    its own polling loop; streams just wait on their job's event. This also
+    catches updates made deep inside agent nodes that never call notify_job.
+    """
+    last_seen: Dict[str, tuple] = {}
+    while True:
+        for job_id, job in list(jobs.items()):
+            snapshot = (job.get("status"), job.get("progress"), job.get("current_agent"))
+            if last_seen.get(job_id) != snapshot:
+                last_seen[job_id] = snapshot
+                event = job_events.get(job_id)
+                if event:
+                    event.set()
+        # Forget jobs that have been archived away
+        if len(last_seen) > len(jobs):
+            last_seen = {k: v for k, v in last_seen.items() if k in jobs}
+        await asyncio.sleep(0.3)
+
 # Pre-compiled regex patterns for O(1) reuse
-URL_PATTERN = re.compile(r'^https://github\.com/([^/]+)/([^/]+?)(?:\.git)?/?$')
-CLEAN_PATTERN = re.compile(r'[^A-Z0-9_]')
+# Tolerates surrounding whitespace, a .git suffix and trailing slashes so
+# validation is a single C-level match with no pre-strip passes
+URL_PATTERN = re.compile(r'^\s*https://github\.com/([^/]+)/([^/]+?)(?:\.git)?/*\s*$')
+UNDERSCORE_PATTERN = re.compile(r'_+')
+
+DAY_NAMES = ('Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun')
+
+class _CleanTable(dict):
+    """str.translate table mapping anything outside [A-Z0-9_] to '_'.
+
+    Entries are computed on first sight via __missing__ and memoized, so
+    translate replaces the old replace()+regex passes with a single scan.
+    """
+    def __missing__(self, codepoint):
+        ch = chr(codepoint)
+        mapped = ch if ('A' <= ch <= 'Z' or '0' <= ch <= '9' or ch == '_') else '_'
+        self[codepoint] = mapped
+        return mapped
+
+CLEAN_TABLE = _CleanTable()
+
+# Per-second cache for ISO timestamps - skips strftime/gmtime on repeat calls
+_iso_cache = (0, "")
+
+def utc_iso(ts: float = None) -> str:
+    """ISO 8601 UTC timestamp string, cached per whole second."""
+    global _iso_cache
+    second = int(ts if ts is not None else time.time())
+    cached_second, cached_value = _iso_cache
+    if second != cached_second or not cached_value:
+        cached_value = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(second))
+        _iso_cache = (second, cached_value)
+    return cached_value
 
 class RunRequest(BaseModel):
     github_url: str
@@ -62,60 +166,109 @@ class RunRequest(BaseModel):
     leader_name: str
     branch_name: str = None
 
-@lru_cache(maxsize=256)
-def validate_github_url(url: str) -> str:
-    """Cached URL validation - O(1) for repeated URLs."""
-    url = url.strip().rstrip("/")
-    
+def new_job(job_id: str, user_id: int, branch: str, req: "RunRequest", start: float,
+            repo_slug: str = "") -> dict:
+    """Build the initial job-state dict in one shot.
+
+    Stays a plain dict (not a __slots__ dataclass) because LangGraph merges
+    node output via dict.update and the SSE stream serializes it directly;
+    the single literal below is also the one place the schema is defined.
+    """
+    return {
+        "job_id": job_id,
+        "user_id": user_id,
+        "status": "queued",
+        "progress": 0,
+        "branch_name": branch,
+        "current_agent": "Initializing",
+        "errors_found": 0,
+        "errors_fixed": 0,
+        "commit_count": 0,
+        "timeline": [],
+        "fixes": [],
+        "score": {},
+        "repo_url": req.github_url,
+        "repo": repo_slug,  # owner/name, computed once at submit time
+        "team_name": req.team_name,
+        "leader_name": req.leader_name,
+        "start_time": start,
+        "timestamp": utc_iso(start),
+        "verify_passed": False,
+        "repo_language": "unknown",
+        "push_success": False,
+        "ci_status": "PENDING"
+    }
+
+@lru_cache(maxsize=4096)
+def validate_github_url(url: str) -> tuple:
+    """Cached URL validation - returns (error, normalized_url, owner, repo).
+
+    Normalizing here (and passing the result along) means trailing-slash
+    and .git variants of the same repo share one canonical form instead of
+    each paying their own parse, and downstream callers never re-strip.
+    """
     match = URL_PATTERN.match(url)
     if not match:
-        return "Invalid URL format. Expected: https://github.com/owner/repo"
-    
+        return ("Invalid URL format. Expected: https://github.com/owner/repo", None, None, None)
+
     owner, repo = match.groups()
-    if not owner or not repo:
-        return "Invalid URL format. Expected: https://github.com/owner/repo"
-    
-    return None  # valid
+    return (None, f"https://github.com/{owner}/{repo}", owner, repo)  # valid
+
+# Short-TTL cache of repo existence checks keyed by (url, token digest).
+# Users resubmitting the same repo within a minute skip the GitHub round trip;
+# the token is hashed so raw credentials never sit in a long-lived dict.
+REPO_CHECK_TTL = 60.0
+_repo_cache: Dict[tuple, tuple] = {}
+
+async def check_repo_exists(url: str, owner: str, repo: str, github_token: str) -> str:
+    """Fast repo existence check via the GitHub REST API - no subprocess fork.
+
+    Expects the pre-normalized URL and owner/repo from validate_github_url.
+    """
+    token_hash = hashlib.sha256((github_token or "").encode()).hexdigest()[:16]
+    cache_key = (url, token_hash)
+    cached = _repo_cache.get(cache_key)
+    if cached and time.time() < cached[0]:
+        return cached[1]
+
+    headers = {"Accept": "application/vnd.github+json"}
+    if github_token:
+        headers["Authorization"] = f"Bearer {github_token}"
 
-def check_repo_exists(github_url: str, github_token: str) -> str:
-    """Fast repo existence check with timeout."""
-    url = github_url.strip().rstrip("/")
-    if not url.endswith(".git"):
-        url = url + ".git"
-    
-    auth_url = url.replace("https://", f"https://x-token:{github_token}@") if github_token else url
-    
     try:
-        result = subprocess.run(
-            ["git", "ls-remote", "--exit-code", auth_url, "HEAD"],
-            capture_output=True, text=True, timeout=10  # Reduced timeout
+        resp = await http_client.get(
+            f"https://api.github.com/repos/{owner}/{repo}",
+            headers=headers
         )
-        
-        if result.returncode == 0:
-            return None
-        
-        stderr_lower = result.stderr.lower()
-        if "not found" in stderr_lower or "repository" in stderr_lower:
-            return f"Repository not found: {github_url}"
-        elif "authentication" in stderr_lower or "denied" in stderr_lower or "403" in stderr_lower:
-            return "GitHub token is invalid or expired"
-        elif "could not resolve" in stderr_lower:
-            return "Cannot reach GitHub"
-        else:
-            return f"Repository not accessible: {github_url}"
-    
-    except subprocess.TimeoutExpired:
+    except httpx.TimeoutException:
         return "Timed out connecting to GitHub"
-    except FileNotFoundError:
-        return "Git is not installed"
+    except httpx.TransportError:
+        return "Cannot reach GitHub"
     except Exception as e:
         return f"GitHub validation failed: {str(e)}"
 
-@lru_cache(maxsize=256)
+    status = resp.status_code
+    if status == 200:
+        result = None
+    elif status == 404:
+        result = f"Repository not found: {url}"
+    elif status in (401, 403):
+        result = "GitHub token is invalid or expired"
+    else:
+        result = f"Repository not accessible: {url}"
+
+    # Only definitive answers get cached; transient transport errors above
+    # return without touching the cache so they are retried immediately
+    _repo_cache[cache_key] = (time.time() + REPO_CHECK_TTL, result)
+    if len(_repo_cache) > 256:
+        _repo_cache.pop(next(iter(_repo_cache)))
+    return result
+
+@lru_cache(maxsize=4096)
 def clean_name(name: str) -> str:
     """Cached name cleaning - O(1) for repeated names."""
-    cleaned = CLEAN_PATTERN.sub('_', name.upper().replace(" ", "_"))
-    return re.sub(r'_+', '_', cleaned).strip('_')
+    cleaned = name.upper().translate(CLEAN_TABLE)
+    return UNDERSCORE_PATTERN.sub('_', cleaned).strip('_')
 
 # ─── GitHub OAuth Endpoints ───────────────────────────────────────
 
@@ -136,38 +289,36 @@ async def auth_github(req: GitHubAuthRequest):
     
     # Exchange code for token
     try:
-        token_data_str = json.dumps({"client_id": client_id, "client_secret": client_secret, "code": req.code})
-        token_req = urllib.request.Request(
+        token_resp = await http_client.post(
             "https://github.com/login/oauth/access_token",
-            data=token_data_str.encode('utf-8'),
+            content=orjson.dumps({"client_id": client_id, "client_secret": client_secret, "code": req.code}),
             headers={"Accept": "application/json", "Content-Type": "application/json"}
         )
-        
-        with urllib.request.urlopen(token_req, timeout=10) as token_resp:
-            token_data = json.loads(token_resp.read().decode('utf-8'))
-        
+        token_resp.raise_for_status()
+        token_data = orjson.loads(token_resp.content)
+
         access_token = token_data.get("access_token")
-        
+
         if not access_token:
             error = token_data.get("error_description", "No access token returned")
             return JSONResponse(status_code=400, content={"detail": error})
-        
+
         # Fetch user profile
-        user_req = urllib.request.Request(
+        user_resp = await http_client.get(
             "https://api.github.com/user",
             headers={"Authorization": f"Bearer {access_token}", "Accept": "application/json"}
         )
-        
-        with urllib.request.urlopen(user_req, timeout=10) as user_resp:
-            user_data = json.loads(user_resp.read().decode('utf-8'))
-    
-    except urllib.error.HTTPError as e:
-        return JSONResponse(status_code=400, content={"detail": f"GitHub API error: {e.code}"})
+        user_resp.raise_for_status()
+        user_data = orjson.loads(user_resp.content)
+
+    except httpx.HTTPStatusError as e:
+        return JSONResponse(status_code=400, content={"detail": f"GitHub API error: {e.response.status_code}"})
     except Exception as e:
         return JSONResponse(status_code=500, content={"detail": f"OAuth failed: {str(e)}"})
     
-    # Save user to database
-    user_id = save_user(
+    # Save user to database off the event loop - sqlite commits block
+    user_id = await asyncio.to_thread(
+        save_user,
         github_id=str(user_data.get("id")),
         username=user_data.get("login", ""),
         email=user_data.get("email", ""),
@@ -188,16 +339,16 @@ async def auth_github(req: GitHubAuthRequest):
 async def verify_token(req: TokenVerifyRequest):
     """Verify a GitHub token is valid."""
     try:
-        user_req = urllib.request.Request(
+        resp = await http_client.get(
             "https://api.github.com/user",
             headers={"Authorization": f"Bearer {req.github_token}", "Accept": "application/json"}
         )
-        
-        with urllib.request.urlopen(user_req, timeout=10) as resp:
-            user_data = json.loads(resp.read().decode('utf-8'))
-        
+        resp.raise_for_status()
+        user_data = orjson.loads(resp.content)
+
         # Save/update user in DB
-        user_id = save_user(
+        user_id = await asyncio.to_thread(
+            save_user,
             github_id=str(user_data.get("id")),
             username=user_data.get("login", ""),
             email=user_data.get("email", ""),
@@ -211,32 +362,47 @@ async def verify_token(req: TokenVerifyRequest):
             "avatar_url": user_data.get("avatar_url"),
             "github_token": req.github_token
         }
-    except urllib.error.HTTPError:
+    except httpx.HTTPStatusError:
         return JSONResponse(status_code=401, content={"detail": "Invalid GitHub token"})
 
+# token digest -> (expiry, profile dict). The SPA polls /api/auth/me on every
+# render, so each hit within the TTL saves a GitHub API round trip (and rate
+# limit quota). Tokens are hashed before use as keys.
+ME_CACHE_TTL = 60.0
+_me_cache: Dict[str, tuple] = {}
+
 @app.get("/api/auth/me")
 async def get_me(authorization: str = Header(None)):
     """Get current user info from token."""
     if not authorization:
         return JSONResponse(status_code=401, content={"detail": "No token provided"})
-    
+
     token = authorization.replace("Bearer ", "").replace("token ", "")
-    
+    token_hash = hashlib.sha256(token.encode()).hexdigest()[:16]
+
+    cached = _me_cache.get(token_hash)
+    if cached and time.time() < cached[0]:
+        return cached[1]
+
     try:
-        user_req = urllib.request.Request(
+        resp = await http_client.get(
             "https://api.github.com/user",
             headers={"Authorization": f"Bearer {token}", "Accept": "application/json"}
         )
-        
-        with urllib.request.urlopen(user_req, timeout=10) as resp:
-            user_data = json.loads(resp.read().decode('utf-8'))
-        
-        return {
+        resp.raise_for_status()
+        user_data = orjson.loads(resp.content)
+
+        profile = {
             "username": user_data.get("login"),
             "avatar_url": user_data.get("avatar_url"),
             "email": user_data.get("email")
         }
-    except urllib.error.HTTPError:
+        _me_cache[token_hash] = (time.time() + ME_CACHE_TTL, profile)
+        while len(_me_cache) > 1024:
+            _me_cache.pop(next(iter(_me_cache)))
+        return profile
+    except httpx.HTTPStatusError:
+        _me_cache.pop(token_hash, None)  # invalid tokens are never cached
         return JSONResponse(status_code=401, content={"detail": "Invalid token"})
 
 @app.get("/api/auth/client-id")
@@ -264,37 +430,36 @@ async def review_push(job_id: str, req: ReviewRequest, authorization: str = Head
     
     # Check auth matches job owner
     if authorization:
-        from database import get_user_by_token
         token = authorization.replace("Bearer ", "").replace("token ", "")
-        user = get_user_by_token(token)
+        user = await asyncio.to_thread(get_user_by_token, token)
         if user and user["id"] != state.get("user_id", 1):
              return JSONResponse(status_code=403, content={"detail": "Unauthorized: Cannot push another user's job"})
 
     try:
-        from agent.orchestrator import execute_review_push
         print(f"[API] Received review for {job_id} - {len(req.declined_files)} files declined")
         
         # Execute the manual push graph extension
         execute_review_push(job_id, jobs, req.declined_files)
-        
+        notify_job(job_id)
+
         # Now archive the finished job into the database
         archive_job(job_id)
         
         return {"status": "success", "jobs_archived": True}
         
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return JSONResponse(status_code=500, content={"detail": str(e)})
 
 # ─── Run Agent ────────────────────────────────────────────────────
 
 @app.post("/api/run-agent")
-async def run_agent(req: RunRequest, bg: BackgroundTasks, authorization: str = Header(None)):
+async def run_agent(req: RunRequest, authorization: str = Header(None)):
     """Optimized run agent endpoint. Uses user's OAuth token or falls back to .env."""
     
-    # Fast validation
-    url_error = validate_github_url(req.github_url)
+    # Fast validation - also yields the normalized URL and owner/repo so
+    # nothing downstream re-parses the raw input
+    url_error, repo_url, owner, repo = validate_github_url(req.github_url)
     if url_error:
         return JSONResponse(status_code=400, content={"detail": url_error})
     
@@ -307,8 +472,9 @@ async def run_agent(req: RunRequest, bg: BackgroundTasks, authorization: str = H
     if not github_token:
         return JSONResponse(status_code=401, content={"detail": "No GitHub token. Please login with GitHub first."})
     
-    # Async repo check (non-blocking)
-    repo_error = check_repo_exists(req.github_url, github_token)
+    # Repo check is natively async now - the shared client awaits without
+    # blocking the event loop
+    repo_error = await check_repo_exists(repo_url, owner, repo, github_token)
     if repo_error:
         return JSONResponse(status_code=400, content={"detail": repo_error})
     
@@ -318,46 +484,61 @@ async def run_agent(req: RunRequest, bg: BackgroundTasks, authorization: str = H
     branch = f"{team_clean}_{leader_clean}_AI_Fix"
     
     # Get user_id from token for DB association
-    from database import get_user_by_token
-    user_data = get_user_by_token(github_token)
+    user_data = await asyncio.to_thread(get_user_by_token, github_token)
     user_id = user_data["id"] if user_data else 1 # Default to 1 if from .env
     
-    # Fast job creation
-    job_id = str(uuid.uuid4())
+    # Fast job creation - .hex skips the dash-formatting of str(uuid4())
+    job_id = uuid.uuid4().hex
     current_time = time.time()
     
-    jobs[job_id] = {
-        "job_id": job_id,
-        "user_id": user_id,
-        "status": "queued",
-        "progress": 0,
-        "branch_name": branch,
-        "current_agent": "Initializing",
-        "errors_found": 0,
-        "errors_fixed": 0,
-        "commit_count": 0,
-        "timeline": [],
-        "fixes": [],
-        "score": {},
-        "repo_url": req.github_url,
-        "team_name": req.team_name,
-        "leader_name": req.leader_name,
-        "start_time": current_time,
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(current_time)),
-        "verify_passed": False,
-        "repo_language": "unknown",
-        "push_success": False,
-        "ci_status": "PENDING"
-    }
-    
-    bg.add_task(run_pipeline, job_id, req, branch, github_token)
-    
+    jobs[job_id] = new_job(job_id, user_id, branch, req, current_time,
+                           repo_slug=f"{owner}/{repo}")
+
+    job_events[job_id] = asyncio.Event()
+
+    # Launch the pipeline as a task we own instead of via BackgroundTasks
+    # (which only starts after the response is sent); keep a reference so
+    # the task isn't garbage-collected mid-run
+    task = asyncio.create_task(run_pipeline(job_id, req, branch, github_token))
+    pipeline_tasks.add(task)
+    task.add_done_callback(pipeline_tasks.discard)
+
     return {"job_id": job_id, "branch_name": branch}
 
+def archived_run_payload(run: dict) -> dict:
+    """Shape a get_run_details row like a terminal job dict.
+
+    The frontend decides done-ness via run.status and reads run.score, keys
+    the raw runs row doesn't carry - without them an archived run served
+    from the DB tier looks perpetually in-flight.
+    """
+    run["status"] = "failed" if run.get("ci_status") == "FAILED" else "done"
+    run["progress"] = 100
+    run["current_agent"] = "Complete"
+    run.setdefault("timeline", [])
+    run["score"] = {
+        "total": run.get("score_total", 0),
+        "elapsed_seconds": run.get("elapsed_seconds", 0),
+    }
+    return run
+
 @app.get("/api/status/{job_id}")
 async def get_status(job_id: str):
-    """O(1) job status lookup."""
-    return jobs.get(job_id, {"error": "Not found"})
+    """Tiered job status lookup: active jobs, then the completed-jobs cache,
+    then SQLite - the shared tier every worker process can see."""
+    job = jobs.get(job_id)
+    if job is not None:
+        return job
+
+    snapshot = completed_jobs.get(job_id)
+    if snapshot is not None:
+        return snapshot
+
+    run = await asyncio.to_thread(get_run_details, job_id)
+    if run:
+        return archived_run_payload(run)
+
+    return {"error": "Not found"}
 
 @app.get("/api/results/{job_id}")
 async def get_results(job_id: str):
@@ -365,45 +546,85 @@ async def get_results(job_id: str):
     # Check active jobs first (O(1))
     if job_id in jobs:
         return jobs[job_id]
-    
-    # Check file cache
+
+    # Check recently completed jobs (O(1))
+    if job_id in completed_jobs:
+        return completed_jobs[job_id]
+
+    # Check file cache - read off-loop and pass the bytes straight through,
+    # skipping the parse + re-serialize round trip entirely
     path = pathlib.Path(f"results/{job_id}.json")
     if path.exists():
-        return json.loads(path.read_text())
-    
-    # Check database (persistent storage)
-    db = SessionLocal()
-    try:
-        run = crud.get_run(db, job_id)
-        if run:
-            return run.to_dict()
-    finally:
-        db.close()
+        async with aiofiles.open(path, "rb") as f:
+            raw = await f.read()
+        return Response(content=raw, media_type="application/json")
     
+    # Check database (persistent storage) - the raw runs table is the one
+    # init_db actually creates, so go through the raw helper
+    run = await asyncio.to_thread(get_run_details, job_id)
+    if run:
+        return archived_run_payload(run)
+
     return {"error": "Not found"}
 
+# One serialized SSE frame per observed job state, shared across clients.
+# Serializing the full job dict (timeline, fixes, score) in every generator
+# is O(viewers x size) for the same bytes; with the cache the first viewer
+# pays for the dump and the rest reuse it.
+frame_cache: Dict[str, tuple] = {}
+
+def job_frame(job_id: str, job: dict) -> bytes:
+    key = (job.get("status"), job.get("progress"), job.get("current_agent"),
+           len(job.get("timeline", ())))
+    cached = frame_cache.get(job_id)
+    if cached and cached[0] == key:
+        return cached[1]
+    frame = b"data: " + orjson.dumps(job, default=str) + b"\n\n"
+    frame_cache[job_id] = (key, frame)
+    return frame
+
 @app.get("/api/stream/{job_id}")
-async def stream(job_id: str):
+async def stream(job_id: str, request: Request):
     """Optimized SSE streaming with reduced polling."""
     async def generator():
         last_status = None
-        
+
         while True:
+            # Bail out as soon as the browser goes away instead of
+            # holding the generator open until the job finishes
+            if await request.is_disconnected():
+                break
+
             job = jobs.get(job_id)
             if not job:
-                yield f"data: {json.dumps({'status': 'error', 'message': 'Job not found'})}\n\n"
+                # Archived while we were streaming: send the final snapshot
+                snapshot = completed_jobs.get(job_id)
+                if snapshot is not None:
+                    yield b"data: " + orjson.dumps(snapshot, default=str) + b"\n\n"
+                else:
+                    yield b'data: ' + orjson.dumps({'status': 'error', 'message': 'Job not found'}) + b'\n\n'
                 break
             
             # Only send if status changed (reduces bandwidth)
             current_status = job.get("status")
             if current_status != last_status or current_status in ("done", "failed"):
-                yield f"data: {json.dumps(job, default=str)}\n\n"
+                yield job_frame(job_id, job)
                 last_status = current_status
             
             if current_status in ("done", "failed"):
                 break
-            
-            await asyncio.sleep(0.3)  # Reduced polling interval
+
+            # Wait for a change signal from the broadcaster/pipeline; the
+            # long timeout only guards against a lost signal
+            event = job_events.get(job_id)
+            if event:
+                try:
+                    await asyncio.wait_for(event.wait(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    pass
+                event.clear()
+            else:
+                await asyncio.sleep(0.3)
     
     return StreamingResponse(
         generator(),
@@ -426,57 +647,82 @@ def archive_job(job_id: str):
     
     # Ensure timestamp
     if "timestamp" not in job_data:
-        job_data["timestamp"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        job_data["timestamp"] = utc_iso()
     
     # Compute elapsed time
     start = job_data.get("start_time", time.time())
     elapsed = time.time() - start
-    
-    if "score" not in job_data or not isinstance(job_data["score"], dict):
-        job_data["score"] = {}
-    
-    job_data["score"]["elapsed_seconds"] = elapsed
-    
-    if "total" not in job_data["score"]:
-        job_data["score"]["total"] = job_data.get("errors_fixed", 0) * 10 + (20 if job_data.get("ci_status") == "PASSED" else 0)
+
+    # Copy the one nested field we mutate - the shallow copy above still
+    # aliases the live job's score dict, so writing through it would leak
+    # archive-time values into the active job
+    score = job_data.get("score")
+    score = dict(score) if isinstance(score, dict) else {}
+
+    score["elapsed_seconds"] = elapsed
+
+    if "total" not in score:
+        score["total"] = job_data.get("errors_fixed", 0) * 10 + (20 if job_data.get("ci_status") == "PASSED" else 0)
+
+    job_data["score"] = score
     
     # Persist to database using save_run
     try:
-        from database import save_run
         user_id = job_data.get("user_id", 1)
         save_run(job_id, user_id, job_data)
+        stats_cache.pop(user_id, None)  # new run -> stats for this user are stale
         print(f"[ARCHIVE] Job {job_id} saved to database with user_id {user_id}")
     except Exception as e:
         print(f"[ARCHIVE] Error saving job {job_id} to DB: {e}")
 
-def run_pipeline(job_id: str, req: RunRequest, branch: str, github_token: str):
-    """Run pipeline with error handling and database save."""
+    # Keep the final snapshot in the bounded completed-jobs index
+    completed_jobs[job_id] = job_data
+    while len(completed_jobs) > COMPLETED_CACHE_SIZE:
+        completed_jobs.pop(next(iter(completed_jobs)))
+
+    # Drop the live entry - the job's memory is now the snapshot plus the
+    # database row, not a third copy that lives for the process lifetime.
+    # SSE streams fall back to the snapshot for their final frame.
+    jobs.pop(job_id, None)
+
+    # Flush the final state to any open SSE stream, then drop the signal
+    notify_job(job_id)
+    job_events.pop(job_id, None)
+    frame_cache.pop(job_id, None)
+
+async def run_pipeline(job_id: str, req: RunRequest, branch: str, github_token: str):
+    """Run pipeline with error handling; archive_job is the single DB writer."""
     try:
         jobs[job_id]["status"] = "cloning"
         jobs[job_id]["progress"] = 5
         jobs[job_id]["current_agent"] = "Clone Agent"
-        
-        from agent.orchestrator import HealingOrchestrator
-        
-        orchestrator = HealingOrchestrator(job_id, jobs)
-        orchestrator.run(
-            repo_url=req.github_url,
-            branch_name=branch,
-            github_token=github_token,
-            team_name=req.team_name,
-            leader_name=req.leader_name
+        notify_job(job_id)
+
+        # notify_job is thread-safe (call_soon_threadsafe), so the orchestrator
+        # can wake SSE clients straight from its worker thread after each node
+        orchestrator = HealingOrchestrator(job_id, jobs, on_update=lambda: notify_job(job_id))
+        # The orchestrator itself is blocking (git/pytest subprocesses), so
+        # it runs on the dedicated pipeline executor; the coroutine just owns it
+        await asyncio.get_running_loop().run_in_executor(
+            pipeline_executor,
+            partial(
+                orchestrator.run,
+                repo_url=req.github_url,
+                branch_name=branch,
+                github_token=github_token,
+                team_name=req.team_name,
+                leader_name=req.leader_name
+            )
         )
-        
-        # Save to database (we skip manual step and rely wholly on archive_job in finally block to prevent duplicate overwriting)
-        pass
-            
+        notify_job(job_id)
+
     except Exception as e:
         jobs[job_id]["status"] = "failed"
         jobs[job_id]["error_message"] = str(e)
         jobs[job_id]["progress"] = 0
         jobs[job_id]["ci_status"] = "FAILED"
+        notify_job(job_id)
         print(f"Pipeline error for {job_id}: {e}")
-        import traceback
         traceback.print_exc()
         # Archive immediately if it crashed
         archive_job(job_id)
@@ -490,13 +736,23 @@ async def health():
     """Fast health check."""
     return {"status": "ok", "active_jobs": len(jobs)}
 
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss counters for the lru caches, for empirical size tuning."""
+    return {
+        "validate_url": validate_github_url.cache_info()._asdict(),
+        "clean_name": clean_name.cache_info()._asdict(),
+        "repo_check_entries": len(_repo_cache),
+        "me_entries": len(_me_cache),
+        "completed_jobs": len(completed_jobs),
+    }
+
 @app.get("/api/test-github")
 async def test_github():
     """Test GitHub API connectivity."""
     try:
-        req = urllib.request.Request("https://api.github.com/zen")
-        with urllib.request.urlopen(req, timeout=5) as response:
-            return {"status": "ok", "github_reachable": True, "message": response.read().decode('utf-8')}
+        resp = await http_client.get("https://api.github.com/zen", timeout=5)
+        return {"status": "ok", "github_reachable": True, "message": resp.text}
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
@@ -509,7 +765,7 @@ async def list_jobs():
 async def list_runs():
     """Return completed runs from database."""
     try:
-        runs = get_user_runs(1, limit=100)
+        runs = await asyncio.to_thread(get_user_runs, 1, limit=100)
         return runs
     except Exception as e:
         return []
@@ -517,15 +773,14 @@ async def list_runs():
 @app.get("/api/db/runs")
 async def list_db_runs(authorization: str = Header(None)):
     """Get runs from database."""
-    from database import get_user_runs, get_user_by_token
     user_id = 1
     if authorization:
         token = authorization.replace("Bearer ", "").replace("token ", "")
-        u = get_user_by_token(token)
+        u = await asyncio.to_thread(get_user_by_token, token)
         if u:
             user_id = u["id"]
     try:
-        runs = get_user_runs(user_id, limit=50)
+        runs = await asyncio.to_thread(get_user_runs, user_id, limit=50)
         return runs
     except Exception as e:
         return {"error": str(e), "runs": []}
@@ -534,117 +789,110 @@ async def list_db_runs(authorization: str = Header(None)):
 async def get_db_run(job_id: str):
     """Get specific run from database."""
     try:
-        from database import get_run_details
-        run = get_run_details(job_id)
+        run = await asyncio.to_thread(get_run_details, job_id)
         if run:
             return run
         return {"error": "Run not found"}
     except Exception as e:
         return {"error": str(e)}
 
+def compute_stats(user_id: int) -> dict:
+    """Blocking stats aggregation - called via asyncio.to_thread."""
+    now = datetime.now()
+    this_month = now.month
+    this_year = now.year
+    last_month_num = 12 if this_month == 1 else this_month - 1
+    last_year = this_year - 1 if this_month == 1 else this_year
+
+    this_month_prefix = f"{this_year}-{this_month:02d}"
+    last_month_prefix = f"{last_year}-{last_month_num:02d}"
+
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+
+        # One conditional-aggregation scan covers all scalar stats plus
+        # both monthly success rates - a single round trip instead of five
+        cursor.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(CASE WHEN ci_status='PASSED' THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(errors_fixed), 0),
+                   COALESCE(AVG(elapsed_seconds), 0),
+                   COALESCE(SUM(CASE WHEN substr(created_at, 1, 7)=? THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN substr(created_at, 1, 7)=? AND ci_status='PASSED' THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN substr(created_at, 1, 7)=? THEN 1 ELSE 0 END), 0),
+                   COALESCE(SUM(CASE WHEN substr(created_at, 1, 7)=? AND ci_status='PASSED' THEN 1 ELSE 0 END), 0)
+            FROM runs WHERE user_id=?
+        ''', (this_month_prefix, this_month_prefix, last_month_prefix, last_month_prefix, user_id))
+
+        (total_runs, passed, total_fixes, avg_time,
+         this_month_total, this_month_passed,
+         last_month_total, last_month_passed) = cursor.fetchone()
+        avg_time = avg_time or 0
+
+        this_month_rate = (this_month_passed / this_month_total * 100) if this_month_total else 0
+        last_month_rate = (last_month_passed / last_month_total * 100) if last_month_total else 0
+
+        # Bug types aggregation over the fixes_json column
+        cursor.execute('''
+            SELECT COALESCE(json_extract(f.value, '$.type'), 'UNKNOWN') AS bug_type, COUNT(*)
+            FROM runs r, json_each(COALESCE(r.fixes_json, '[]')) f
+            WHERE r.user_id=?
+            GROUP BY bug_type
+        ''', (user_id,))
+        by_bug_type = {row[0]: row[1] for row in cursor.fetchall()}
+
+        # By-day grouping pushed into SQL - one GROUP BY over the last
+        # 7 days instead of parsing each timestamp in Python
+        by_day = {DAY_NAMES[(now.weekday() - i) % 7]: {"runs": 0, "fixes": 0} for i in range(6, -1, -1)}
+
+        cursor.execute('''
+            SELECT strftime('%w', created_at) AS dow, COUNT(id), COALESCE(SUM(errors_fixed), 0)
+            FROM runs
+            WHERE user_id=? AND created_at >= date('now', '-7 days')
+            GROUP BY dow
+        ''', (user_id,))
+
+        for dow, day_runs, day_fixes in cursor.fetchall():
+            if dow is None:
+                continue
+            dn = DAY_NAMES[(int(dow) + 6) % 7]  # strftime %w: 0=Sunday
+            if dn in by_day:
+                by_day[dn]["runs"] += day_runs
+                by_day[dn]["fixes"] += day_fixes
+
+        return {
+            "totalRuns": total_runs,
+            "successRate": round((passed / total_runs * 100) if total_runs > 0 else 0, 1),
+            "totalFixes": total_fixes,
+            "avgFixTime": round(avg_time, 1),
+            "byBugType": by_bug_type,
+            "thisMonth": round(this_month_rate, 1),
+            "lastMonth": round(last_month_rate, 1),
+            "byDay": by_day
+        }
+    finally:
+        conn.close()
+
 @app.get("/api/stats")
 async def get_stats(authorization: str = Header(None)):
     """Dashboard stats computed using direct O(1) SQLite aggregations."""
     try:
-        from database import get_user_by_token
         user_id = 1
         if authorization:
             token = authorization.replace("Bearer ", "").replace("token ", "")
-            u = get_user_by_token(token)
+            u = await asyncio.to_thread(get_user_by_token, token)
             if u:
                 user_id = u["id"]
 
-        import sqlite3
-        from datetime import datetime
-        conn = sqlite3.connect("data/rift_agent.db")
-        try:
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT COUNT(*) FROM runs WHERE user_id=?", (user_id,))
-            total_runs = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT COUNT(*) FROM runs WHERE user_id=? AND ci_status='PASSED'", (user_id,))
-            passed = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT COALESCE(SUM(errors_fixed), 0) FROM runs WHERE user_id=?", (user_id,))
-            total_fixes = cursor.fetchone()[0] or 0
-            
-            cursor.execute("SELECT COALESCE(AVG(elapsed_seconds), 0) FROM runs WHERE user_id=?", (user_id,))
-            avg_time = cursor.fetchone()[0] or 0
-
-            # Bug types aggregation
-            cursor.execute('''
-                SELECT f.type, COUNT(f.id) 
-                FROM fixes f 
-                JOIN runs r ON f.run_id = r.id 
-                WHERE r.user_id=? 
-                GROUP BY f.type
-            ''', (user_id,))
-            by_bug_type = {row[0] or "UNKNOWN": row[1] for row in cursor.fetchall()}
-
-            now = datetime.now()
-            this_month = now.month
-            this_year = now.year
-            last_month_num = 12 if this_month == 1 else this_month - 1
-            last_year = this_year - 1 if this_month == 1 else this_year
-
-            this_month_prefix = f"{this_year}-{this_month:02d}"
-            last_month_prefix = f"{last_year}-{last_month_num:02d}"
-
-            # Monthly Success rates
-            cursor.execute('''
-                SELECT substr(created_at, 1, 7) as month, COUNT(id), SUM(CASE WHEN ci_status = 'PASSED' THEN 1 ELSE 0 END)
-                FROM runs
-                WHERE user_id=? AND substr(created_at, 1, 7) IN (?, ?)
-                GROUP BY substr(created_at, 1, 7)
-            ''', (user_id, this_month_prefix, last_month_prefix))
-            
-            this_month_rate = 0
-            last_month_rate = 0
-            for row in cursor.fetchall():
-                rate = (row[2] / row[1] * 100) if row[1] > 0 else 0
-                if row[0] == this_month_prefix:
-                    this_month_rate = rate
-                elif row[0] == last_month_prefix:
-                    last_month_rate = rate
-
-            # By Day grouping using python for last 7 days bounded calculation
-            day_names = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
-            by_day = {day_names[(now.weekday() - i) % 7]: {"runs": 0, "fixes": 0} for i in range(6, -1, -1)}
-            
-            fallback_epoch_ts = time.time() - 7 * 86400
+        # Serve from the short-TTL cache unless a new run invalidated it
+        cached = stats_cache.get(user_id)
+        if cached and cached[0] > time.time():
+            return cached[1]
 
-            cursor.execute('''
-                SELECT created_at, errors_fixed FROM runs 
-                WHERE user_id=? AND created_at >= date('now', '-7 days')
-            ''', (user_id,))
-
-            for row in cursor.fetchall():
-                ts, r_fixes = row
-                try:
-                    if ts:
-                        dt = datetime.strptime(ts[:19].replace("T", " "), "%Y-%m-%d %H:%M:%S")
-                        if (now - dt).days <= 7:
-                            dn = day_names[dt.weekday()]
-                            if dn in by_day:
-                                by_day[dn]["runs"] += 1
-                                by_day[dn]["fixes"] += (r_fixes or 0)
-                except Exception:
-                    pass
-            
-            return {
-                "totalRuns": total_runs,
-                "successRate": round((passed / total_runs * 100) if total_runs > 0 else 0, 1),
-                "totalFixes": total_fixes,
-                "avgFixTime": round(avg_time, 1),
-                "byBugType": by_bug_type,
-                "thisMonth": round(this_month_rate, 1),
-                "lastMonth": round(last_month_rate, 1),
-                "byDay": by_day
-            }
-        finally:
-            conn.close()
+        payload = await asyncio.to_thread(compute_stats, user_id)
+        stats_cache[user_id] = (time.time() + STATS_CACHE_TTL, payload)
+        return payload
     except Exception as e:
-        import traceback
         traceback.print_exc()
         return {"totalRuns": 0, "successRate": 0, "totalFixes": 0, "avgFixTime": 0, "byBugType": {}, "thisMonth": 0, "lastMonth": 0, "byDay": {}}
@@ -3,9 +3,9 @@ SQLAlchemy ORM models for the Healing Agent database.
 Three tables: runs, fixes, timeline_events.
 """
 from sqlalchemy import (
-    Column, String, Integer, Float, Boolean, Text, DateTime, ForeignKey
+    Column, String, Integer, Float, Boolean, Text, DateTime, ForeignKey, Index
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime, timezone
 
 from database import Base
@@ -17,12 +17,13 @@ class Run(Base):
 
     id = Column(String, primary_key=True, index=True)  # UUID job_id
     repo_url = Column(String, nullable=False)
+    repo_slug = Column(String, default="")  # owner/name, computed at submit time
     team_name = Column(String, nullable=False)
     leader_name = Column(String, nullable=False)
     branch_name = Column(String, nullable=False)
 
     # Status tracking
-    status = Column(String, default="queued")  # queued|cloning|testing|analyzing|fixing|pushing|done|failed
+    status = Column(String, default="queued", index=True)  # queued|cloning|testing|analyzing|fixing|pushing|done|failed
     progress = Column(Integer, default=0)
     current_agent = Column(String, default="Initializing")
     error_message = Column(Text, default="")
@@ -54,14 +55,18 @@ class Run(Base):
     updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc),
                         onupdate=lambda: datetime.now(timezone.utc))
 
-    # Raw output (can be large)
-    raw_test_output = Column(Text, default="")
+    # Raw output (can be large). Deferred: to_dict never touches it, so list
+    # queries skip hydrating hundreds of KB per row; access still lazy-loads.
+    raw_test_output = deferred(Column(Text, default=""))
 
-    # Relationships
+    # Relationships. selectin loading issues one IN-query per collection
+    # instead of a joined load, which cartesian-multiplies rows (a run with
+    # 20 fixes and 30 events comes back as 600 joined rows that SQLAlchemy
+    # then de-duplicates in Python).
     fixes = relationship("Fix", back_populates="run", cascade="all, delete-orphan",
-                         lazy="joined")
+                         lazy="selectin")
     timeline_events = relationship("TimelineEvent", back_populates="run",
-                                   cascade="all, delete-orphan", lazy="joined",
+                                   cascade="all, delete-orphan", lazy="selectin",
                                    order_by="TimelineEvent.id")
 
     def to_dict(self):
@@ -69,7 +74,7 @@ class Run(Base):
         return {
             "job_id": self.id,
             "repo_url": self.repo_url,
-            "repo": self.repo_url.split("github.com/")[-1].replace(".git", "") if "github.com/" in self.repo_url else self.repo_url,
+            "repo": self.repo_slug or (self.repo_url.split("github.com/")[-1].replace(".git", "") if "github.com/" in self.repo_url else self.repo_url),
             "team_name": self.team_name,
             "leader_name": self.leader_name,
             "branch_name": self.branch_name,
@@ -137,9 +142,35 @@ class Fix(Base):
         }
 
 
+class StatsDaily(Base):
+    """Pre-aggregated run counters per (day, ci_status) bucket.
+
+    Maintained on write in save_completed_run so dashboard stats reads
+    become a tiny range scan instead of re-aggregating every run.
+    """
+    __tablename__ = "stats_daily"
+
+    day = Column(String, primary_key=True)  # YYYY-MM-DD
+    ci_status = Column(String, primary_key=True)  # PENDING|PASSED|FAILED
+    runs = Column(Integer, default=0)
+    fixes = Column(Integer, default=0)
+    elapsed = Column(Float, default=0.0)
+
+
+class StatsBugType(Base):
+    """Pre-aggregated fix counts per bug type, maintained on write."""
+    __tablename__ = "stats_bugtype"
+
+    type = Column(String, primary_key=True)  # LINTING|SYNTAX|LOGIC|...
+    count = Column(Integer, default=0)
+
+
 class TimelineEvent(Base):
     """A CI/CD timeline event during a run."""
     __tablename__ = "timeline_events"
+    # Composite index matching the (run_id filter, id order) access pattern
+    # of the selectin load, so the ordered fetch needs no sort step
+    __table_args__ = (Index("ix_timeline_run_id_id", "run_id", "id"),)
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     run_id = Column(String, ForeignKey("runs.id", ondelete="CASCADE"), nullable=False, index=True)